@@ -32,13 +32,11 @@ def polygon_to_wkt(coordinates):
     # GeoJSON coordinates are in [x, y] format
     # Need to convert to WKT: POLYGON ((x1 y1, x2 y2, ...))
     ring = coordinates[0]  # Get the outer ring
-    wkt_coords = []
+    flat = [value for coord in ring for value in (coord[0], coord[1])]
 
-    for coord in ring:
-        x, y = coord[0], coord[1]
-        wkt_coords.append(f"{x} {y}")
-
-    wkt = f"POLYGON (({', '.join(wkt_coords)}))"
+    # Format all vertices with a single C-level % call
+    template = ", ".join(["%s %s"] * len(ring))
+    wkt = f"POLYGON (({template % tuple(flat)}))"
     return wkt
 
 
@@ -13,7 +13,7 @@ MONGO_HOST="localhost:27017"
 DB_NAME="camic"
 
 # --- INDEX COMMANDS ---
-echo "Creating mark.provenance.image.imageid index..." | tee -a "$LOGFILE"
+echo "Creating mark and analysis indexes..." | tee -a "$LOGFILE"
 
 mongo --host "$MONGO_HOST" <<EOF | tee -a "$LOGFILE"
 use $DB_NAME
@@ -23,6 +23,16 @@ db.mark.createIndex(
   { name: "idx_imageid", background: true }
 )
 
+// Serves the ETL's per-analysis mark query (mongodb_to_rdf.py hints it by name)
+db.mark.createIndex(
+  {
+    "provenance.image.imageid": 1,
+    "provenance.analysis.execution_id": 1,
+    "provenance.image.slide": 1
+  },
+  { name: "idx_mark_image_exec_slide", background: true }
+)
+
 db.analysis.createIndex(
   { "analysis.execution_id": 1 },
   { name: "idx_execid", background: true }
@@ -5,36 +5,94 @@ Optimized for ~4 billion marks
 Author: Bear 🐻
 """
 
+import atexit
+import gc
 import gzip
 import hashlib
+import io
 import logging
+import math
 import os
 import signal
-import sys
-import threading
 import time
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
-from multiprocessing import Manager, Pool
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from multiprocessing import Manager, Pool, Queue
+from multiprocessing import TimeoutError as ResultTimeout
 from pathlib import Path
 
-# Add parent directory to path to import utils
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import numpy as np
+from bson import ObjectId
+from bson.errors import InvalidId
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    from isal import igzip, igzip_threaded  # ISA-L SIMD DEFLATE, drop-in for gzip
+except ImportError:
+    igzip = igzip_threaded = None
+
+try:
+    from zlib_ng import gzip_ng  # zlib-ng, drop-in for gzip at the same levels
+except ImportError:
+    gzip_ng = None
+
+try:
+    from zlib_ng import gzip_ng_threaded
+except ImportError:
+    gzip_ng_threaded = None
+
+# utils and sha256_pipeline sit next to this script, whose directory is
+# already first on sys.path (also in spawned workers)
 from sha256_pipeline import get_auth, get_real_hash_from_node
-from utils import mongo_connection
+from utils import ManagedMongoClient, mongo_connection
 
 # =====================
 # 📧 CONFIG - OPTIMIZED FOR PARALLEL PROCESSING
 # =====================
-NUM_WORKERS = 20  # Use 20 cores for processing, leave 4 for system/MongoDB
+# Use 20 cores for processing, leave 4 for system/MongoDB (ETL_NUM_WORKERS)
+NUM_WORKERS = int(os.getenv("ETL_NUM_WORKERS", 20))
 BATCH_SIZE = 1000  # Marks per TTL file
+WKT_NUMPY_MIN_VERTICES = 16  # Smaller polygons are scaled in plain Python
 OUTPUT_DIR = Path("ttl_output")
 CHECKPOINT_DIR = Path("checkpoints")  # Multiple checkpoint files
 LOG_FILE = "etl_parallel.log"
 LOG_MAX_BYTES = 50 * 1024 * 1024  # 50MB log files
 LOG_BACKUP_COUNT = 10
-GZIP_COMPRESSION_LEVEL = 6  # 1=fastest, 9=best compression
+# stdlib gzip / zlib-ng level (override with ETL_GZIP_LEVEL). On this
+# repetitive Turtle, 1-3 compress several times faster than 6 and land within
+# a few percent of its size; 6 is zlib's default; 7-9 cost far more CPU for
+# almost no further gain
+GZIP_COMPRESSION_LEVEL = int(os.getenv("ETL_GZIP_LEVEL", 3))
+# Used instead when python-isal is installed. ISA-L only has levels 0-3, so
+# an ETL_GZIP_LEVEL of 0 / 1-3 / 4-6 / 7-9 maps to 0 / 1 / 2 / 3; unset it
+# stays at 3, ISA-L's best ratio and still faster than zlib's fastest levels
+ISAL_COMPRESSION_LEVEL = (
+    min(max((GZIP_COMPRESSION_LEVEL + 2) // 3, 0), 3)
+    if "ETL_GZIP_LEVEL" in os.environ
+    else 3
+)
+# Background threads compressing each batch file (python-isal or zlib-ng;
+# override with ETL_GZIP_THREADS). 1 compresses and writes on a thread of
+# its own while the worker keeps reading marks and formatting Turtle;
+# more also cut the stream into blocks compressed in parallel; 0
+# compresses inline. Leave at 1 while NUM_WORKERS already keeps every core busy
+GZIP_THREADS = int(os.getenv("ETL_GZIP_THREADS", 1))
+GZIP_BUFFER_SIZE = 256 * 1024  # Bytes gathered before each compressor call
+# Evict finished batch files from the page cache (ETL_DROP_OUTPUT_CACHE=1).
+# Worth it when mongod shares this host: write-once output otherwise crowds
+# out its working set. Costs one fdatasync per batch file
+DROP_OUTPUT_CACHE = os.getenv("ETL_DROP_OUTPUT_CACHE") == "1" and hasattr(
+    os, "posix_fadvise"
+)
+# Gen-0 GC threshold in workers (CPython default 700). Each decoded mark is
+# a dict plus one list per vertex, so the default ran a collection every few
+# marks; all of it is acyclic and already freed by reference counting
+WORKER_GC_THRESHOLD = 100000
 
 # MongoDB connection settings
 # IMPORTANT: Update these based on where you run the script!
@@ -43,16 +101,120 @@ GZIP_COMPRESSION_LEVEL = 6  # 1=fastest, 9=best compression
 MONGO_HOST = "172.18.0.2"
 MONGO_PORT = 27017
 MONGO_DB = "camic"
+# Wire compression for the mark getMore stream. The server (4.2+) picks the
+# first listed compressor it supports; PyMongo drops zstd/snappy when their
+# packages are not installed, leaving zlib
+MONGO_URI = f"mongodb://{MONGO_HOST}:{MONGO_PORT}/?compressors=zstd,snappy,zlib"
+# Marks per getMore (override with ETL_MARK_BATCH_SIZE). The server also ends
+# each reply at 16 MiB, which bounds worker memory whatever the mark size
+MARK_CURSOR_BATCH_SIZE = int(os.getenv("ETL_MARK_BATCH_SIZE", 10000))
+# Compound index matching every equality in the mark query, built by
+# build_indexes.sh. Set to None to let the planner pick. main() only passes
+# it on if the index exists, since a hint naming a missing index fails
+# every query
+MARK_INDEX_HINT = "idx_mark_image_exec_slide"
+
+CHECKPOINT_FLUSH_EVERY = 32  # Checkpoint lines per group write + fdatasync
+CHECKPOINT_FLUSH_SECONDS = 5  # ...or flush sooner if this much time has passed
+ANALYSIS_PAGE_SIZE = NUM_WORKERS * 10  # Analyses fetched per dispatch page
+ANALYSIS_ID_PAGE_SIZE = 10000  # _ids per resume scan (served from the _id index)
+# Only the analysis fields the workers read
+ANALYSIS_PROJECTION = {
+    "image": 1,
+    "analysis.execution_id": 1,
+    "analysis.algorithm_params": 1,
+}
 
 # Create directories
 OUTPUT_DIR.mkdir(exist_ok=True)
 CHECKPOINT_DIR.mkdir(exist_ok=True)
 
+
+def _first_element(path):
+    """Aggregation expression for the first element of an array field (or null)"""
+    return {"$cond": [{"$isArray": path}, {"$arrayElemAt": [path, 0]}, None]}
+
+
+# Server-side reshaping of each mark down to just the values add_mark_to_ttl
+# reads - keeps BSON payloads (and client-side decoding) small
+MARK_PROJECT_STAGES = [
+    {
+        "$project": {
+            "exec_id": "$provenance.analysis.execution_id",
+            "feature": _first_element("$geometries.features"),
+            "annotation": _first_element("$userUpdate.mark.annotation"),
+        }
+    },
+    {
+        "$project": {
+            "_id": 0,
+            "mark_id": {"$toString": "$_id"},  # Hex string, same as str(ObjectId)
+            "exec_id": 1,
+            "geometry": {
+                "type": "$feature.geometry.type",
+                "coordinates": "$feature.geometry.coordinates",
+            },
+            "footprint": "$feature.properties.footprint",
+            "nucleustype": "$feature.properties.nucleustype",
+            "annotation_id": "$annotation.annotationID",
+        }
+    },
+]
+
 # SNOMED code for nuclear material (only hard-coded value as requested)
 NUCLEAR_MATERIAL_SNOMED = "http://snomed.info/id/68841002"
 
-# Thread-safe file lock for checkpoint operations
-checkpoint_lock = threading.Lock()
+# Constant @prefix block shared by every batch header. Built once at import,
+# so forked pool workers share it copy-on-write instead of rebuilding it
+TTL_PREFIXES = "\n".join(
+    [
+        "@prefix geo: <http://www.opengis.net/ont/geosparql#> .",
+        "@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .",
+        "@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .",
+        "@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .",
+        "@prefix snomed: <http://snomed.info/id/> .",
+        "@prefix so:   <https://schema.org/> .",
+        "@prefix loinc: <http://loinc.org/rdf/> .",
+        "@prefix hal: <https://halcyon.is/ns/> .",
+    ]
+)
+
+# Pre-built mark TTL - each mark gets its own geo:hasMember statement and
+# starts with the semicolon that continues the previous line. Keyed by
+# (has nucleus type, is nuclear material, has human annotation)
+_MARK_HEAD = """ ;
+        geo:hasMember [
+            a geo:Feature ;
+            hal:markId "%s" ;
+            hal:executionId "%s" ;"""
+_MARK_NUCLEUS_TYPE = """
+            hal:nucleusType "%s" ;"""
+_MARK_MATERIAL = """
+            hal:hasMaterialType snomed:68841002 ;  # Nuclear material"""
+_MARK_ANNOTATION = """
+            hal:hasAnnotation <%s> ;  # Human-verified SNOMED code"""
+_MARK_TAIL = """
+            hal:footprint %s ;
+            geo:hasGeometry [
+                geo:asWKT "%s"^^geo:wktLiteral
+            ]
+        ]"""
+MARK_TEMPLATES = {
+    (has_type, is_material, has_annotation): _MARK_HEAD
+    + (_MARK_NUCLEUS_TYPE if has_type else "")
+    + (_MARK_MATERIAL if is_material else "")
+    + (_MARK_ANNOTATION if has_annotation else "")
+    + _MARK_TAIL
+    for has_type in (False, True)
+    for is_material in (False, True)
+    for has_annotation in (False, True)
+}
+
+# Closes the hasFeatureCollection node at the end of every batch file
+BATCH_TERMINATOR = b"\n    ] .\n"
+
+# Data-only sync for checkpoint appends (fdatasync is not on every platform)
+fdatasync = getattr(os, "fdatasync", os.fsync)
 
 
 # =====================
@@ -60,8 +222,9 @@ checkpoint_lock = threading.Lock()
 # =====================
 def setup_worker_logger(worker_id):
     """Setup logger for each worker process.
-    Each worker logs to its own rotating file *and* to the console
-    so we can see progress in real time.
+    Records are handed to the main process over a queue (see main()), where
+    one listener thread writes them to the log file and the console, so
+    workers never block on log I/O or interleave their output.
     """
     logger = logging.getLogger(f"Worker-{worker_id}")
     logger.setLevel(logging.INFO)
@@ -70,24 +233,12 @@ def setup_worker_logger(worker_id):
     if logger.handlers:
         return logger
 
-    # File handler for this worker
-    file_handler = RotatingFileHandler(
-        f"etl_worker_{worker_id}.log",
-        maxBytes=LOG_MAX_BYTES,
-        backupCount=2,
-    )
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-
-    # Console handler so worker logs also show up in stdout
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(
-        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    )
-    logger.addHandler(console_handler)
+    log_queue = _worker_context["log_queue"]
+    if log_queue is not None:
+        logger.addHandler(QueueHandler(log_queue))
+    else:
+        # Not running under main()'s pool - log straight to the console
+        logger.addHandler(worker_console)
 
     return logger
 
@@ -107,18 +258,63 @@ console = logging.StreamHandler()
 console.setFormatter(logging.Formatter("%(asctime)s - %(message)s", "%H:%M:%S"))
 main_logger.addHandler(console)
 
+# Worker records reach the same log file (via the queue listener in main),
+# with their own console format so the worker name stays visible
+worker_console = logging.StreamHandler()
+worker_console.setFormatter(formatter)
+
 
 # =====================
 # 🔍 PARALLEL CHECKPOINT MANAGER (WITH FIXES)
 # =====================
-class ParallelCheckpointManager:
-    """Checkpoint manager that works across multiple processes with thread-safe operations"""
+class CheckpointWriter:
+    """
+    Write-only checkpoint access for pool workers. Never reads the
+    completed/failed files, so it is cheap to create for every analysis.
+    """
 
     def __init__(self, checkpoint_dir):
         self.checkpoint_dir = Path(checkpoint_dir)
         self.completed_file = self.checkpoint_dir / "completed_analyses.txt"
         self.failed_file = self.checkpoint_dir / "failed_analyses.txt"
         self.in_progress_file = self.checkpoint_dir / "in_progress.txt"
+        self._fds = {}  # O_APPEND descriptors, opened on first use
+
+    def _append(self, filepath, data, sync=True):
+        """
+        Append data with a single O_APPEND write (and one data-only sync).
+        Each file is appended on its own, with no Python-level lock: the
+        kernel positions every O_APPEND write at end-of-file atomically.
+        """
+        fd = self._fds.get(filepath)
+        if fd is None:
+            # Ensure directory exists
+            self.checkpoint_dir.mkdir(exist_ok=True)
+            fd = os.open(filepath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self._fds[filepath] = fd
+
+        os.write(fd, data.encode())
+        if sync:
+            fdatasync(fd)  # Appended lines only; skip metadata sync
+
+    def mark_in_progress(self, analysis_id, worker_id):
+        """Mark as being processed by a worker (informational, not synced)"""
+        # Nothing reads this file back on resume, so a lost tail after a
+        # crash is harmless and an fsync per analysis is not worth it.
+        # Lines are far below PIPE_BUF, so concurrent workers' appends
+        # never interleave.
+        self._append(
+            self.in_progress_file,
+            f"{analysis_id}|worker_{worker_id}|{datetime.now().isoformat()}\n",
+            sync=False,
+        )
+
+
+class ParallelCheckpointManager(CheckpointWriter):
+    """Checkpoint manager; the main process group-commits completed/failed records"""
+
+    def __init__(self, checkpoint_dir):
+        super().__init__(checkpoint_dir)
 
         # Load completed and failed sets
         self.completed = self._load_set(self.completed_file)
@@ -127,6 +323,12 @@ class ParallelCheckpointManager:
         # Ensure in_progress file exists before any worker tries to use it
         self.in_progress_file.touch(exist_ok=True)
 
+        # Checkpoint lines buffered by queue_completed/mark_failed, not yet
+        # on disk; written by flush() as one group commit per file
+        self.pending = {self.completed_file: [], self.failed_file: []}
+        self.pending_count = 0
+        self.last_flush = time.time()
+
     def _load_set(self, filepath):
         """Load a set of IDs from a file"""
         ids = set()
@@ -146,46 +348,67 @@ class ParallelCheckpointManager:
         """Check if analysis previously failed"""
         return str(analysis_id) in self.failed
 
+    def done_id_keys(self):
+        """
+        Frozen set of completed + failed IDs keyed like id_key(): the raw
+        12-byte ObjectId form where possible, so a pending-scan can test
+        membership without formatting every _id as a hex string.
+        """
+        keys = set()
+        for aid in self.completed | self.failed:
+            try:
+                keys.add(ObjectId(aid).binary)
+            except (InvalidId, TypeError):
+                keys.add(aid)
+        return frozenset(keys)
+
+    @staticmethod
+    def id_key(analysis_id):
+        """Membership key for done_id_keys()"""
+        if isinstance(analysis_id, ObjectId):
+            return analysis_id.binary
+        return str(analysis_id)
+
     def should_process(self, analysis_id):
         """Check if we should process this analysis"""
         aid = str(analysis_id)
         return aid not in self.completed and aid not in self.failed
 
-    def mark_completed(self, analysis_id):
-        """Mark analysis as completed (thread-safe append with fsync)"""
-        with checkpoint_lock:
-            # Ensure directory exists
-            self.checkpoint_dir.mkdir(exist_ok=True)
-
-            with open(self.completed_file, "a") as f:
-                f.write(f"{analysis_id}\n")
-                f.flush()
-                os.fsync(f.fileno())  # Force write to disk
+    def queue_completed(self, analysis_id):
+        """Buffer a completion; written out in groups by flush"""
+        self.completed.add(str(analysis_id))
+        self._queue(self.completed_file, f"{analysis_id}\n")
 
     def mark_failed(self, analysis_id, error=None):
-        """Mark analysis as failed (thread-safe)"""
-        with checkpoint_lock:
-            # Ensure directory exists
-            self.checkpoint_dir.mkdir(exist_ok=True)
+        """Buffer a failure; written out in groups by flush"""
+        self.failed.add(str(analysis_id))
+        self._queue(self.failed_file, f"{analysis_id}|{error}\n")
+
+    def _queue(self, filepath, line):
+        """Add a checkpoint line to the next group commit"""
+        self.pending[filepath].append(line)
+        self.pending_count += 1
+        if self.pending_count >= CHECKPOINT_FLUSH_EVERY:
+            self.flush()
+        else:
+            self.flush_if_due()
 
-            with open(self.failed_file, "a") as f:
-                f.write(f"{analysis_id}|{error}\n")
-                f.flush()
-                os.fsync(f.fileno())
+    def flush_if_due(self):
+        """Flush buffered lines once CHECKPOINT_FLUSH_SECONDS have passed"""
+        if (
+            self.pending_count
+            and time.time() - self.last_flush >= CHECKPOINT_FLUSH_SECONDS
+        ):
+            self.flush()
 
-    def mark_in_progress(self, analysis_id, worker_id):
-        """Mark as being processed by a worker (thread-safe with file existence check)"""
-        with checkpoint_lock:
-            # Ensure file exists
-            if not self.in_progress_file.exists():
-                self.in_progress_file.touch()
-
-            with open(self.in_progress_file, "a") as f:
-                f.write(
-                    f"{analysis_id}|worker_{worker_id}|{datetime.now().isoformat()}\n"
-                )
-                f.flush()
-                os.fsync(f.fileno())  # Force write to disk
+    def flush(self):
+        """Write all buffered checkpoint lines, one disk barrier per file"""
+        for filepath, lines in self.pending.items():
+            if lines:
+                self._append(filepath, "".join(lines))
+                lines.clear()
+        self.pending_count = 0
+        self.last_flush = time.time()
 
     def get_stats(self):
         """Get processing statistics"""
@@ -197,8 +420,9 @@ class ParallelCheckpointManager:
 # =====================
 
 
+@lru_cache(maxsize=4096)
 def get_image_hash(image_id):
-    """Generate SHA-256 hash for image ID (fallback method)."""
+    """Generate SHA-256 hash for image ID (fallback method, memoized per image)."""
     return hashlib.sha256(image_id.encode()).hexdigest()
 
 
@@ -235,36 +459,155 @@ def get_real_image_hash(slide_id, auth, hash_cache, failed_nodes):
         return None, False
 
 
+if njit is not None:
+
+    @njit(cache=True)
+    def _scale_coords(coords, image_width, image_height):
+        """Denormalize an (N, 2) float64 vertex array (JIT-compiled)"""
+        out = np.empty_like(coords)
+        for i in range(coords.shape[0]):
+            out[i, 0] = coords[i, 0] * image_width
+            out[i, 1] = coords[i, 1] * image_height
+        return out
+
+else:
+
+    def _scale_coords(coords, image_width, image_height):
+        """Denormalize an (N, 2) float64 vertex array (NumPy fallback)"""
+        coords *= (image_width, image_height)
+        return coords
+
+
+# Accepted coordinate types (bool is an int, as in the original x * width)
+_COORD_TYPES = (int, float)
+
+
+@lru_cache(maxsize=1024)
+def _wkt_polygon_template(vertex_count):
+    """%-template for a closed WKT polygon ring with vertex_count vertices"""
+    return "POLYGON ((" + ", ".join(["%.2f %.2f"] * vertex_count) + "))"
+
+
 def polygon_to_wkt(geometry, image_width, image_height):
     """Convert MongoDB polygon to WKT"""
     try:
-        if not geometry or geometry.get("type") != "Polygon":
+        if not geometry or geometry["type"] != "Polygon":
             return None
 
-        coords = geometry.get("coordinates", [[]])[0]
+        coords = geometry["coordinates"][0]
         if not coords:
             return None
 
-        # Denormalize and format
-        wkt_coords = []
-        for x, y in coords:
-            px = x * image_width
-            py = y * image_height
-            wkt_coords.append(f"{px:.2f} {py:.2f}")
+        # Both paths accept only int/float coordinates: strings, None and
+        # other objects are rejected, whatever the ring size
+        if len(coords) < WKT_NUMPY_MIN_VERTICES:
+            # Small rings: array setup would cost more than it saves
+            flat = []
+            for x, y in coords:
+                if not (isinstance(x, _COORD_TYPES) and isinstance(y, _COORD_TYPES)):
+                    return None
+                flat.append(x * image_width)
+                flat.append(y * image_height)
+        else:
+            # Denormalize all vertices in one vectorized (or JIT) pass.
+            # Without a dtype, strings give a str array and None an object
+            # array instead of being parsed or turned into NaN
+            arr = np.asarray(coords)
+            if arr.dtype.kind not in "biuf" or arr.ndim != 2 or arr.shape[1] != 2:
+                return None
+            arr = np.ascontiguousarray(arr, dtype=np.float64)
+            flat = _scale_coords(arr, image_width, image_height).ravel().tolist()
+
+        # NaN/Infinity would be written as "nan"/"inf", which is not WKT
+        if not all(map(math.isfinite, flat)):
+            return None
 
-        # Close polygon
-        if wkt_coords and wkt_coords[0] != wkt_coords[-1]:
-            wkt_coords.append(wkt_coords[0])
+        # Close polygon (compare at output precision, like the formatted text)
+        first = "%.2f %.2f" % (flat[0], flat[1])
+        if first != "%.2f %.2f" % (flat[-2], flat[-1]):
+            flat.extend(flat[:2])
 
-        return f"POLYGON (({', '.join(wkt_coords)}))"
-    except:
+        # Format every vertex with a single C-level % call
+        return _wkt_polygon_template(len(flat) // 2) % tuple(flat)
+    except (TypeError, ValueError, IndexError):
         return None
 
 
-def create_ttl_header(
-    analysis_doc, batch_num, auth=None, hash_cache=None, failed_nodes=None
-):
-    """Create TTL header as string (manual building for clean output)"""
+def open_ttl_gz(output_file):
+    """
+    Open a .ttl.gz batch file for binary writing (ISA-L igzip if available,
+    then zlib-ng, then stdlib gzip).
+    Small writes are gathered in a GZIP_BUFFER_SIZE buffer so the
+    compressor is called on large chunks rather than once per write. With
+    GZIP_THREADS, compression and the file write run on background threads.
+    Data goes to partial_ttl_path(output_file) until finish_ttl_gz() moves
+    the completed file into place.
+    """
+    output_file = partial_ttl_path(output_file)
+    if igzip_threaded is not None and GZIP_THREADS > 0:
+        gz = igzip_threaded.open(
+            output_file,
+            "wb",
+            compresslevel=ISAL_COMPRESSION_LEVEL,
+            threads=GZIP_THREADS,
+        )
+    elif igzip is not None:
+        gz = igzip.open(output_file, "wb", compresslevel=ISAL_COMPRESSION_LEVEL)
+    elif gzip_ng_threaded is not None and GZIP_THREADS > 0:
+        gz = gzip_ng_threaded.open(
+            output_file,
+            "wb",
+            compresslevel=GZIP_COMPRESSION_LEVEL,
+            threads=GZIP_THREADS,
+        )
+    elif gzip_ng is not None:
+        gz = gzip_ng.open(output_file, "wb", compresslevel=GZIP_COMPRESSION_LEVEL)
+    else:
+        gz = gzip.open(output_file, "wb", compresslevel=GZIP_COMPRESSION_LEVEL)
+    return io.BufferedWriter(gz, buffer_size=GZIP_BUFFER_SIZE)
+
+
+def partial_ttl_path(output_file):
+    """Name a batch file is written under until it is complete"""
+    return output_file.with_suffix(".tmp")
+
+
+def finish_ttl_gz(out, output_file):
+    """
+    Terminate and close a batch file opened by open_ttl_gz(), then rename it
+    to output_file, so a final-named batch file is always complete Turtle
+    """
+    partial_file = partial_ttl_path(output_file)
+    out.write(BATCH_TERMINATOR)  # Close hasFeatureCollection
+    out.close()
+
+    if DROP_OUTPUT_CACHE:
+        fd = os.open(partial_file, os.O_RDONLY)
+        try:
+            fdatasync(fd)  # Dirty pages are not dropped until written back
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+    os.replace(partial_file, output_file)
+
+
+def abort_ttl_gz(out, output_file):
+    """Close and delete a batch file that open_ttl_gz() opened but never finished"""
+    try:
+        out.close()
+    except Exception:
+        pass  # Already failing; the partial file is removed either way
+    partial_ttl_path(output_file).unlink(missing_ok=True)
+
+
+def create_ttl_header(analysis_doc, auth=None, hash_cache=None, failed_nodes=None):
+    """
+    Build the TTL header for an analysis once (manual building for clean
+    output). Only the batch-number comment differs between batches, so
+    this returns ((head, tail), image_width, image_height) with the encoded
+    text before and after that line; see format_batch_header().
+    """
     analysis = analysis_doc["analysis"]
     image = analysis_doc["image"]
     params = analysis["algorithm_params"]
@@ -301,21 +644,16 @@ def create_ttl_header(
     analysis_id = str(analysis_doc["_id"])
 
     # Build TTL string manually
-    ttl_lines = [
+    head_lines = [
         "# GeoSPARQL representation of pathology image analysis",
         f"# Analysis ID: {analysis_id}",
         f"# Execution: {exec_id}",
         f"# Image: {image_id}",
-        f"# Batch: {batch_num:06d}",
+        "",  # Batch comment goes here
+    ]
+    ttl_lines = [
         "",
-        "@prefix geo: <http://www.opengis.net/ont/geosparql#> .",
-        "@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .",
-        "@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .",
-        "@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .",
-        "@prefix snomed: <http://snomed.info/id/> .",
-        "@prefix so:   <https://schema.org/> .",
-        "@prefix loinc: <http://loinc.org/rdf/> .",
-        "@prefix hal: <https://halcyon.is/ns/> .",
+        TTL_PREFIXES,
         "",
     ]
 
@@ -354,106 +692,61 @@ def create_ttl_header(
         ]
     )
 
-    return "\n".join(ttl_lines), image_width, image_height
+    head = "\n".join(head_lines).encode("utf-8")
+    tail = "\n".join(ttl_lines).encode("utf-8")
+    return (head, tail), image_width, image_height
 
 
-def add_mark_to_ttl(mark, image_width, image_height, is_first_feature):
+def format_batch_header(header, batch_num):
+    """Complete a create_ttl_header() header for one batch file"""
+    head, tail = header
+    return b"%b# Batch: %06d\n%b" % (head, batch_num, tail)
+
+
+def add_mark_to_ttl(mark, image_width, image_height):
     """
-    Convert a mark document to TTL string format.
+    Convert a mark (as reshaped by MARK_PROJECT_STAGES) to TTL string format.
     Returns (ttl_string, success_bool)
     """
     try:
-        mark_id = str(mark["_id"])
-        provenance = mark.get("provenance", {})
-        analysis = provenance.get("analysis", {})
-        exec_id = analysis.get("execution_id", "unknown")
-
-        # Get geometry and coordinates
-        geom = mark.get("geometries", {})
-        features = geom.get("features", [])
-        if not features:
-            return "", False
+        mark_id = mark["mark_id"]
+        exec_id = mark.get("exec_id", "unknown")
 
-        feature = features[0]
-        geometry = feature.get("geometry", {})
-        properties = feature.get("properties", {})
+        # Convert geometry of the first feature (see MARK_PROJECT_STAGES)
+        # first, so malformed marks bail out before any other work
+        try:
+            wkt = polygon_to_wkt(mark["geometry"], image_width, image_height)
+        except KeyError:
+            return "", False
+        if not wkt:
+            return "", False
 
-        # Get properties
-        footprint = properties.get("footprint", 0)
-        nucleustype = properties.get("nucleustype", "")
+        footprint = mark.get("footprint", 0)
+        nucleustype = mark.get("nucleustype", "")
 
-        # Get annotations if any
-        annotations = []
-        user_update = mark.get("userUpdate", {})
-        if "mark" in user_update:
-            annotations = user_update["mark"].get("annotation", [])
+        # annotationID of the first annotation, if any
+        ann_id = mark.get("annotation_id")
 
-        # Check if it's nuclear material
-        is_nuclear_material = False
-        if nucleustype:
-            nucleus_parts = nucleustype.split(".")
-            if len(nucleus_parts) >= 3:
-                # Example: "tumor.ep.1" → tumor cells
-                cell_type = nucleus_parts[0]  # tumor, lymphocyte, etc.
-                is_nuclear_material = True
+        # Typed nuclei like "tumor.ep.1" are nuclear material
+        is_nuclear_material = bool(nucleustype) and nucleustype.count(".") >= 2
 
         # Only add human annotation if one exists AND is valid SNOMED
-        has_valid_annotation = False
         annotation_code = None
-        if annotations:
-            # Get the first annotation
-            first_annotation = annotations[0]
-            ann_id = first_annotation.get("annotationID")
-            if ann_id and ann_id.startswith("http://snomed.info/id/"):
-                has_valid_annotation = True
-                annotation_code = ann_id
-
-        # Convert geometry
-        wkt = polygon_to_wkt(geometry, image_width, image_height)
-        if not wkt:
-            return "", False
-
-        # Build mark TTL - each mark gets its own geo:hasMember statement
-        mark_lines = [
-            " ;",  # Semicolon to continue from previous line
-            "        geo:hasMember [",
-            "            a geo:Feature ;",
-            f'            hal:markId "{mark_id}" ;',
-        ]
+        if ann_id and ann_id.startswith("http://snomed.info/id/"):
+            annotation_code = ann_id
 
-        # Add execution ID
-        mark_lines.append(f'            hal:executionId "{exec_id}" ;')
-
-        # Add cell type
+        # Fill the pre-built template for this mark's optional lines
+        values = [mark_id, exec_id]
         if nucleustype:
-            mark_lines.append(f'            hal:nucleusType "{nucleustype}" ;')
-
-        # Add SNOMED code for nuclear material (automatic for all nucleus marks)
-        if is_nuclear_material:
-            mark_lines.append(
-                "            hal:hasMaterialType snomed:68841002 ;  # Nuclear material"
-            )
-
-        # Only add human annotation if it exists and is valid
-        if has_valid_annotation and annotation_code:
-            mark_lines.append(
-                f"            hal:hasAnnotation <{annotation_code}> ;  # Human-verified SNOMED code"
-            )
-
-        # Add numeric properties
-        mark_lines.append(f"            hal:footprint {footprint} ;")
-
-        # Add geometry (no trailing semicolon - this is the last property)
-        mark_lines.extend(
-            [
-                "            geo:hasGeometry [",
-                f'                geo:asWKT "{wkt}"^^geo:wktLiteral',
-                "            ]",
-                "        ]",  # Close the geo:hasMember anonymous node
-            ]
-        )
-
-        return "\n".join(mark_lines), True
+            values.append(nucleustype)
+        if annotation_code:
+            values.append(annotation_code)
+        values.append(footprint)
+        values.append(wkt)
+        template = MARK_TEMPLATES[
+            (bool(nucleustype), is_nuclear_material, bool(annotation_code))
+        ]
+        return template % tuple(values), True
 
     except Exception:
         # Silently skip malformed marks
@@ -463,12 +756,64 @@ def add_mark_to_ttl(mark, image_width, image_height, is_first_feature):
 # =====================
 # 👷 WORKER PROCESS FUNCTION
 # =====================
+# One MongoDB client per worker process, shared by every analysis it handles
+_worker_client = None
+
+# Per-run values every task needs, handed to each worker once by
+# init_worker instead of being pickled into every task tuple
+_worker_context = {
+    "checkpoint": CheckpointWriter(CHECKPOINT_DIR),
+    "auth": None,
+    "hash_cache": None,
+    "failed_nodes": None,
+    "log_queue": None,
+    "mark_index_hint": None,  # MARK_INDEX_HINT once main() has verified it
+}
+
+
+def init_worker(
+    checkpoint_dir, auth, hash_cache, failed_nodes, log_queue, mark_index_hint
+):
+    """
+    Pool initializer - store the run context, and open the checkpoint writer
+    and MongoDB client once per worker process
+    """
+    _worker_context.update(
+        checkpoint=CheckpointWriter(checkpoint_dir),
+        auth=auth,
+        hash_cache=hash_cache,
+        failed_nodes=failed_nodes,
+        log_queue=log_queue,
+        mark_index_hint=mark_index_hint,
+    )
+    get_worker_db()
+
+    # Keep the long-lived startup objects out of every collection, and
+    # collect far less often during the mark loop
+    gc.freeze()
+    gc.set_threshold(WORKER_GC_THRESHOLD, *gc.get_threshold()[1:])
+
+
+def get_worker_db():
+    """Get the worker's database handle, connecting lazily if needed"""
+    global _worker_client
+    if _worker_client is None:
+        _worker_client = ManagedMongoClient(MONGO_URI, MONGO_DB)
+        _worker_client.connect()
+        atexit.register(_worker_client.close)
+    return _worker_client.get_database()
+
+
 def process_analysis_worker(args):
     """
     Worker function - processes one analysis document.
-    Each worker gets its own MongoDB connection.
+    Each worker process reuses its own MongoDB connection across analyses.
     """
-    worker_id, analysis_doc, checkpoint_dir, auth, hash_cache, failed_nodes = args
+    worker_id, analysis_doc = args
+    checkpoint = _worker_context["checkpoint"]
+    auth = _worker_context["auth"]
+    hash_cache = _worker_context["hash_cache"]
+    failed_nodes = _worker_context["failed_nodes"]
 
     logger = setup_worker_logger(worker_id)
 
@@ -486,154 +831,122 @@ def process_analysis_worker(args):
     try:
         start_time = time.time()
 
-        # Initialize checkpoint manager
-        checkpoint = ParallelCheckpointManager(checkpoint_dir)
-
         # Try to mark in progress - if this fails, continue anyway
         try:
             checkpoint.mark_in_progress(analysis_id, worker_id)
         except Exception as e:
-            logger.warning(f"Could not mark {analysis_id} in progress: {e}")
+            logger.warning("Could not mark %s in progress: %s", analysis_id, e)
             # Continue anyway - the important part is processing the data
 
-        # Create MongoDB connection (each worker gets its own)
-        with mongo_connection(f"mongodb://{MONGO_HOST}:{MONGO_PORT}/", MONGO_DB) as db:
-
-            # Query for marks that belong to this analysis
-            query = {
-                "provenance.analysis.execution_id": exec_id,
-                "provenance.image.imageid": img_id,
-            }
-
-            # Add slide filter if available (helps with index selectivity)
-            if slide:
-                query["provenance.image.slide"] = slide
-
-            logger.info("Streaming marks for %s:%s", exec_id, img_id)
-
-            # Stream marks from MongoDB
-            marks_cursor = db.mark.find(query, batch_size=5000, no_cursor_timeout=False)
-
-            try:
-                batch_num = 1
-                batch_marks = 0
-                processed = 0
-                is_first_feature = True
-
-                # Start first batch
-                ttl_content, img_width, img_height = create_ttl_header(
-                    analysis_doc, batch_num, auth, hash_cache, failed_nodes
-                )
-
-                for mark in marks_cursor:
-                    # Convert mark to TTL
-                    mark_ttl, success = add_mark_to_ttl(
-                        mark, img_width, img_height, is_first_feature
-                    )
-                    if success:
-                        ttl_content += mark_ttl  # Each mark already has its own semicolon at the start
-                        batch_marks += 1
-                        processed += 1
-                        is_first_feature = False
-
-                    # Write batch when full
-                    if batch_marks >= BATCH_SIZE:
-                        # Remove trailing semicolon and newline, then close structure
-                        if ttl_content.rstrip().endswith(";"):
-                            ttl_content = ttl_content.rstrip()[
-                                :-1
-                            ]  # Remove last semicolon
-                        ttl_content += "\n    ] .\n"  # Close hasFeatureCollection
-
-                        # Write compressed TTL file
-                        output_file = (
-                            OUTPUT_DIR
-                            / str(exec_id)
-                            / str(img_id)
-                            / f"batch_{batch_num:06d}.ttl.gz"
-                        )
-                        output_file.parent.mkdir(parents=True, exist_ok=True)
-
-                        with gzip.open(
-                            output_file,
-                            "wt",
-                            encoding="utf-8",
-                            compresslevel=GZIP_COMPRESSION_LEVEL,
-                        ) as f:
-                            f.write(ttl_content)
-
-                        logger.info(
-                            "Wrote batch %d for %s:%s (%s marks)",
-                            batch_num,
-                            exec_id,
-                            img_id,
-                            batch_marks,
-                        )
-
-                        batch_num += 1
-                        batch_marks = 0
+        # Reuse this worker process's MongoDB client (see init_worker)
+        db = get_worker_db()
+
+        # Query for marks that belong to this analysis
+        query = {
+            "provenance.analysis.execution_id": exec_id,
+            "provenance.image.imageid": img_id,
+        }
+
+        # Add slide filter if available (helps with index selectivity)
+        if slide:
+            query["provenance.image.slide"] = slide
+
+        logger.info("Streaming marks for %s:%s", exec_id, img_id)
+
+        # Stream marks from MongoDB
+        aggregate_options = {"batchSize": MARK_CURSOR_BATCH_SIZE}
+        mark_index_hint = _worker_context["mark_index_hint"]
+        if mark_index_hint:
+            aggregate_options["hint"] = mark_index_hint
+        marks_cursor = db.mark.aggregate(
+            [{"$match": query}, *MARK_PROJECT_STAGES],
+            comment=f"etl:{exec_id}:{img_id}",  # Visible in the server profiler
+            **aggregate_options,
+        )
 
-                        # Start new TTL content with new header
-                        ttl_content, img_width, img_height = create_ttl_header(
-                            analysis_doc, batch_num, auth, hash_cache, failed_nodes
-                        )
-                        is_first_feature = True
-
-                # After loop: flush any remaining marks
-                if batch_marks > 0:
-                    # Remove trailing semicolon and newline, then close structure
-                    if ttl_content.rstrip().endswith(";"):
-                        ttl_content = ttl_content.rstrip()[:-1]  # Remove last semicolon
-                    ttl_content += "\n    ] .\n"  # Close hasFeatureCollection
-
-                    output_file = (
-                        OUTPUT_DIR
-                        / str(exec_id)
-                        / str(img_id)
-                        / f"batch_{batch_num:06d}.ttl.gz"
-                    )
-                    output_file.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            batch_num = 1
+            batch_marks = 0
+            processed = 0
+            out = None  # Open batch file; created on its first mark
+            out_dir = OUTPUT_DIR / str(exec_id) / str(img_id)
+
+            # Header (and image hash lookup) once per analysis, not per batch
+            header, img_width, img_height = create_ttl_header(
+                analysis_doc, auth, hash_cache, failed_nodes
+            )
 
-                    with gzip.open(
-                        output_file,
-                        "wt",
-                        encoding="utf-8",
-                        compresslevel=GZIP_COMPRESSION_LEVEL,
-                    ) as f:
-                        f.write(ttl_content)
+            for mark in marks_cursor:
+                # Convert mark to TTL
+                mark_ttl, success = add_mark_to_ttl(mark, img_width, img_height)
+                if not success:
+                    continue
+
+                # Stream straight into the compressed batch file so only
+                # one mark's TTL is held in memory at a time
+                if out is None:
+                    if batch_num == 1:
+                        # Created with the first batch file, once per analysis
+                        out_dir.mkdir(parents=True, exist_ok=True)
+                    output_file = out_dir / f"batch_{batch_num:06d}.ttl.gz"
+                    out = open_ttl_gz(output_file)
+                    out.write(format_batch_header(header, batch_num))
+
+                # Each mark already has its own semicolon at the start
+                out.write(mark_ttl.encode("utf-8"))
+                batch_marks += 1
+                processed += 1
+
+                # Close batch when full
+                if batch_marks >= BATCH_SIZE:
+                    finish_ttl_gz(out, output_file)
+                    out = None
 
                     logger.info(
-                        "Wrote FINAL batch %d for %s:%s → %s (%s total processed marks)",
+                        "Wrote batch %d for %s:%s (%s marks)",
                         batch_num,
                         exec_id,
                         img_id,
-                        output_file,
-                        f"{processed:,}",
+                        batch_marks,
                     )
 
-            finally:
-                try:
-                    marks_cursor.close()
-                except Exception:
-                    pass
-
-            elapsed = time.time() - start_time
-            logger.info(
-                "✅ Completed %s:%s – %s processed marks in %d batches (%.2f seconds)",
-                exec_id,
-                img_id,
-                f"{processed:,}",
-                batch_num,
-                elapsed,
-            )
-
-            # Try to mark as completed
+                    batch_num += 1
+                    batch_marks = 0
+
+            # After loop: close the partially filled last batch
+            if out is not None:
+                finish_ttl_gz(out, output_file)
+                out = None
+
+                logger.info(
+                    "Wrote FINAL batch %d for %s:%s → %s (%s total processed marks)",
+                    batch_num,
+                    exec_id,
+                    img_id,
+                    output_file,
+                    f"{processed:,}",
+                )
+        finally:
+            if out is not None:
+                # Failed mid-batch: leave no truncated batch file behind
+                abort_ttl_gz(out, output_file)
             try:
-                checkpoint.mark_completed(analysis_id)
-            except Exception as e:
-                logger.warning(f"Could not mark {analysis_id} as completed: {e}")
+                marks_cursor.close()
+            except Exception:
+                pass
+
+        elapsed = time.time() - start_time
+        logger.info(
+            "✅ Completed %s:%s – %s processed marks in %d batches (%.2f seconds)",
+            exec_id,
+            img_id,
+            f"{processed:,}",
+            batch_num,
+            elapsed,
+        )
 
-            return ("completed", analysis_id, processed, batch_num)
+        # Completion is checkpointed by the main process (batched)
+        return ("completed", analysis_id, processed, batch_num)
 
     except Exception as e:
         logger.error(
@@ -645,19 +958,68 @@ def process_analysis_worker(args):
             exc_info=True,
         )
 
-        # Try to mark as failed
-        try:
-            checkpoint = ParallelCheckpointManager(checkpoint_dir)
-            checkpoint.mark_failed(analysis_id, str(e))
-        except:
-            pass
-
+        # Failure is checkpointed by the main process (batched)
         return ("failed", analysis_id, 0, 0, str(e))
 
 
 # =====================
 # 🚀 MAIN PARALLEL CONTROLLER
 # =====================
+def iter_pending_analyses(db, checkpoint, page_size=ANALYSIS_PAGE_SIZE):
+    """
+    Yield analysis documents that still need processing.
+    Walks the collection by _id in index-only pages of bare IDs, drops the
+    checkpointed ones, and fetches full documents only for what is left
+    (or, with an empty checkpoint, pages full documents in one pass).
+    No cursor stays open while the pool is busy, and no ID list spanning
+    the collection is held in memory.
+    """
+    done = checkpoint.done_id_keys()
+    id_key = checkpoint.id_key
+    last_id = None
+
+    if not done:
+        # Fresh run: everything is pending, so page full documents directly
+        # instead of scanning IDs first and fetching them a second time
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            page = list(
+                db.analysis.find(query, ANALYSIS_PROJECTION)
+                .sort("_id", 1)
+                .limit(page_size)
+                .batch_size(page_size)
+            )
+            if not page:
+                return
+            last_id = page[-1]["_id"]
+            yield from page
+
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        # batch_size == limit: each page arrives in a single reply instead
+        # of the default 101-document first batch plus a getMore
+        ids = [
+            doc["_id"]
+            for doc in db.analysis.find(query, {"_id": 1})
+            .sort("_id", 1)
+            .limit(ANALYSIS_ID_PAGE_SIZE)
+            .batch_size(ANALYSIS_ID_PAGE_SIZE)
+        ]
+        if not ids:
+            return
+
+        last_id = ids[-1]
+        pending = [aid for aid in ids if id_key(aid) not in done]
+        for i in range(0, len(pending), page_size):
+            yield from list(
+                db.analysis.find(
+                    {"_id": {"$in": pending[i : i + page_size]}}, ANALYSIS_PROJECTION
+                )
+                .sort("_id", 1)
+                .batch_size(page_size)
+            )
+
+
 def main():
     """Main function - parallel processing with 24 cores"""
     main_logger.info("=" * 60)
@@ -683,28 +1045,31 @@ def main():
         f"Resuming from checkpoint - Already completed: {initial_stats['completed']}, Failed: {initial_stats['failed']}"
     )
 
-    # Get list of analyses to process
-    with mongo_connection(f"mongodb://{MONGO_HOST}:{MONGO_PORT}/", MONGO_DB) as db:
-        total_analyses = db.analysis.count_documents({})
-        main_logger.info(f"Found {total_analyses:,} total analyses in database")
-
-        # Get IDs of analyses to process
-        analyses_to_process = []
-        for doc in db.analysis.find(
-            {}, {"_id": 1, "analysis.execution_id": 1, "image.imageid": 1}
-        ):
-            if checkpoint.should_process(str(doc["_id"])):
-                analyses_to_process.append(doc["_id"])
-
-        main_logger.info(f"Need to process {len(analyses_to_process):,} analyses")
-
-        if not analyses_to_process:
-            main_logger.info("Nothing to process!")
-            return
+    # Stream analyses to process straight into the worker pool
+    with mongo_connection(MONGO_URI, MONGO_DB) as db:
+        # Collection metadata count - O(1), unlike count_documents({}),
+        # which scans the _id index; only used for progress reporting
+        total_analyses = db.analysis.estimated_document_count()
+        main_logger.info(f"Found ~{total_analyses:,} total analyses in database")
+
+        # Checkpointed IDs all come from this collection, so this is close
+        # unless analyses were deleted since they were checkpointed
+        pending_estimate = max(
+            total_analyses - initial_stats["completed"] - initial_stats["failed"], 0
+        )
+        main_logger.info(f"Need to process ~{pending_estimate:,} analyses")
+
+        mark_index_hint = MARK_INDEX_HINT
+        if mark_index_hint and mark_index_hint not in db.mark.index_information():
+            main_logger.warning(
+                "Index %s not found on mark (run build_indexes.sh); "
+                "letting the query planner choose",
+                mark_index_hint,
+            )
+            mark_index_hint = None
 
-        # Process in chunks to avoid loading all documents at once
-        chunk_size = NUM_WORKERS * 10  # Process 10 rounds of work at a time
         total_processed = 0
+        total_failed = 0
         total_marks = 0
         start_time = time.time()
 
@@ -713,58 +1078,56 @@ def main():
             hash_cache = manager.dict()
             failed_nodes = manager.dict()
 
-            # Create process pool
-            with Pool(processes=NUM_WORKERS) as pool:
-                try:
-                    for chunk_start in range(0, len(analyses_to_process), chunk_size):
-                        chunk_ids = analyses_to_process[
-                            chunk_start : chunk_start + chunk_size
-                        ]
-
-                        # Fetch full documents for this chunk
-                        chunk_docs = []
-                        for analysis_doc in db.analysis.find(
-                            {"_id": {"$in": chunk_ids}}
-                        ):
-                            chunk_docs.append(analysis_doc)
-
-                        if not chunk_docs:
-                            continue
-
-                        main_logger.info(
-                            f"Processing chunk {chunk_start // chunk_size + 1} ({len(chunk_docs)} analyses)"
-                        )
+            # Tasks carry only the worker label and the analysis document;
+            # the shared run context goes to each worker once via init_worker.
+            # Worker arguments are generated lazily, one page of analyses at a
+            # time. The pool's task-handler thread drains this generator in
+            # the background and keeps the task pipe full, so page fetches
+            # already overlap with workers running and with this thread
+            # consuming results - no separate prefetch thread is needed
+            worker_args = (
+                (i % NUM_WORKERS, doc)
+                for i, doc in enumerate(iter_pending_analyses(db, checkpoint))
+            )
 
-                        # Prepare worker arguments
-                        worker_args = []
-                        for i, doc in enumerate(chunk_docs):
-                            worker_id = i % NUM_WORKERS
-                            worker_args.append(
-                                (
-                                    worker_id,
-                                    doc,
-                                    str(CHECKPOINT_DIR),
-                                    auth,
-                                    hash_cache,
-                                    failed_nodes,
-                                )
-                            )
-
-                        chunk_index = chunk_start // chunk_size + 1
-                        main_logger.info(
-                            "Dispatching %d analyses to workers for chunk %d (cached hashes: %d)",
-                            len(worker_args),
-                            chunk_index,
-                            len(hash_cache),
+            # Worker log records are written here by a single listener thread
+            log_queue = Queue()
+            log_listener = QueueListener(log_queue, handler, worker_console)
+            log_listener.start()
+
+            try:
+                # Create process pool
+                with Pool(
+                    processes=NUM_WORKERS,
+                    initializer=init_worker,
+                    initargs=(
+                        str(CHECKPOINT_DIR),
+                        auth,
+                        hash_cache,
+                        failed_nodes,
+                        log_queue,
+                        mark_index_hint,
+                    ),
+                ) as pool:
+                    try:
+                        # Process in parallel and stream results as they finish.
+                        # chunksize=1 keeps load balanced: analyses range from a
+                        # handful to millions of marks
+                        results = pool.imap_unordered(
+                            process_analysis_worker, worker_args, chunksize=1
                         )
+                        while True:
+                            # Wake at least every CHECKPOINT_FLUSH_SECONDS, so
+                            # buffered results are flushed on time even while
+                            # one long analysis keeps every result waiting
+                            try:
+                                result = results.next(timeout=CHECKPOINT_FLUSH_SECONDS)
+                            except StopIteration:
+                                break
+                            except ResultTimeout:
+                                checkpoint.flush_if_due()
+                                continue
 
-                        # Process in parallel and stream results as they finish
-                        for i, result in enumerate(
-                            pool.imap_unordered(
-                                process_analysis_worker, worker_args, chunksize=1
-                            ),
-                            1,
-                        ):
                             if not result:
                                 continue
 
@@ -774,26 +1137,24 @@ def main():
                                 _, analysis_id, mark_count, batch_count = result[:4]
                                 total_processed += 1
                                 total_marks += mark_count
+                                checkpoint.queue_completed(analysis_id)
 
                                 main_logger.info(
-                                    "Chunk %d: completed analysis %s – %s marks in %d batches "
-                                    "(total processed: %s / %s analyses)",
-                                    chunk_index,
+                                    "Completed analysis %s – %s marks in %d batches "
+                                    "(total processed: %s / ~%s analyses)",
                                     analysis_id,
                                     f"{mark_count:,}",
                                     batch_count,
                                     f"{total_processed:,}",
-                                    f"{len(analyses_to_process):,}",
+                                    f"{pending_estimate:,}",
                                 )
 
                             elif status == "failed":
                                 _, analysis_id, _, _, error = result
+                                total_failed += 1
                                 checkpoint.mark_failed(analysis_id, error)
                                 main_logger.error(
-                                    "Chunk %d: FAILED analysis %s – %s",
-                                    chunk_index,
-                                    analysis_id,
-                                    error,
+                                    "FAILED analysis %s – %s", analysis_id, error
                                 )
 
                             # Throttled progress report every 50 completed analyses
@@ -801,7 +1162,7 @@ def main():
                                 elapsed = time.time() - start_time
                                 rate = total_marks / elapsed if elapsed > 0 else 0
                                 eta_hours = (
-                                    (len(analyses_to_process) - total_processed)
+                                    max(pending_estimate - total_processed, 0)
                                     * (elapsed / total_processed)
                                     / 3600
                                     if total_processed > 0
@@ -811,7 +1172,7 @@ def main():
                                 main_logger.info(
                                     f"""
         Progress Report:
-          Processed: {total_processed:,} / {len(analyses_to_process):,} analyses
+          Processed: {total_processed:,} / ~{pending_estimate:,} analyses
           Total marks: {total_marks:,}
           Cached hashes: {len(hash_cache)}
           Failed hash lookups: {len(failed_nodes)}
@@ -820,10 +1181,21 @@ def main():
         """
                                 )
 
-                except KeyboardInterrupt:
-                    main_logger.warning("⚠️ Interrupted by user - checkpoint saved")
-                    pool.terminate()
-                    pool.join()
+                    except KeyboardInterrupt:
+                        main_logger.warning(
+                            "⚠️ Interrupted by user - checkpoint saved"
+                        )
+                        pool.terminate()
+                        pool.join()
+                    finally:
+                        checkpoint.flush()
+            finally:
+                # Drain any worker records still queued, even if dispatch failed
+                log_listener.stop()
+
+            if not total_processed and not total_failed:
+                main_logger.info("Nothing to process!")
+                return
 
             # Final statistics
             final_stats = checkpoint.get_stats()
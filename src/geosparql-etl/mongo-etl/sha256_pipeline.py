@@ -50,11 +50,20 @@ def extract_file_path(drupal_json: dict) -> str:
 
 
 def compute_sha256(path: str) -> str:
-    """Compute SHA256 from file bytes."""
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
+    """Compute SHA256 from file bytes (hashed in C where available)."""
+    with open(path, "rb", buffering=0) as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        # Older Pythons: read into one reused buffer, no per-chunk bytes copies
+        h = hashlib.sha256()
+        buf = bytearray(1024 * 1024)
+        view = memoryview(buf)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
     return h.hexdigest()
 
 
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# mongodb_to_rdf and utils are imported the way the script imports them
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,81 @@
+import json
+import signal
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from utils.checkpoint import SimpleCheckpoint
+
+UTILS_PARENT = str(Path(__file__).resolve().parent.parent)
+
+
+def _run_child(code, checkpoint_file):
+    """Start a Python child that can import utils.checkpoint"""
+    prelude = f"import sys; sys.path.insert(0, {UTILS_PARENT!r})\n"
+    script = prelude + textwrap.dedent(code)
+    return subprocess.Popen(
+        [sys.executable, "-c", script, str(checkpoint_file)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+
+def test_save_batches_writes(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    checkpoint = SimpleCheckpoint(path, flush_every=3)
+    for item in ("a", "b"):
+        checkpoint.add(item)
+        checkpoint.save()
+    assert not path.exists()
+
+    checkpoint.add("c")
+    checkpoint.save()
+    assert sorted(json.loads(path.read_text())) == ["a", "b", "c"]
+    checkpoint.close()
+
+
+def test_close_flushes_and_unregisters(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    with SimpleCheckpoint(path) as checkpoint:
+        checkpoint.add("a")
+        checkpoint.save()
+    assert json.loads(path.read_text()) == ["a"]
+    assert SimpleCheckpoint(path).processed == {"a"}
+
+
+def test_exit_before_flush_every_loses_nothing(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    child = _run_child(
+        """
+        from utils.checkpoint import SimpleCheckpoint
+        checkpoint = SimpleCheckpoint(sys.argv[1])
+        for i in range(5):
+            checkpoint.add(str(i))
+            checkpoint.save()
+        """,
+        path,
+    )
+    assert child.wait(timeout=30) == 0
+    assert sorted(json.loads(path.read_text())) == ["0", "1", "2", "3", "4"]
+
+
+def test_sigterm_before_flush_every_loses_nothing(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    child = _run_child(
+        """
+        import time
+        from utils.checkpoint import SimpleCheckpoint
+        checkpoint = SimpleCheckpoint(sys.argv[1])
+        for i in range(5):
+            checkpoint.add(str(i))
+            checkpoint.save()
+        print("ready", flush=True)
+        time.sleep(30)
+        """,
+        path,
+    )
+    assert child.stdout.readline().strip() == "ready"
+    child.send_signal(signal.SIGTERM)
+    assert child.wait(timeout=30) == 128 + signal.SIGTERM
+    assert sorted(json.loads(path.read_text())) == ["0", "1", "2", "3", "4"]
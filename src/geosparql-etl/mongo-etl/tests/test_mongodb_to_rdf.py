@@ -0,0 +1,110 @@
+import pytest
+
+
+@pytest.fixture
+def etl(tmp_path, monkeypatch):
+    """mongodb_to_rdf with output under tmp_path (its log file lands there too)"""
+    monkeypatch.chdir(tmp_path)
+    module = pytest.importorskip("mongodb_to_rdf")
+    monkeypatch.setattr(module, "OUTPUT_DIR", tmp_path / "ttl_output")
+    return module
+
+
+class _FakeCheckpoint:
+    def mark_in_progress(self, analysis_id, worker_id):
+        pass
+
+
+class _FakeDB:
+    def __init__(self, marks):
+        self.mark = self
+        self._marks = marks
+
+    def aggregate(self, pipeline, **kwargs):
+        return self._marks
+
+
+class _FailingCursor:
+    """Yields some marks, then raises like a dropped connection"""
+
+    def __init__(self, good_marks):
+        self.good_marks = good_marks
+
+    def __iter__(self):
+        for i in range(self.good_marks):
+            yield {"mark_id": str(i)}
+        raise RuntimeError("cursor died")
+
+    def close(self):
+        pass
+
+
+def test_failure_mid_batch_leaves_no_batch_file(etl, tmp_path, monkeypatch):
+    monkeypatch.setattr(etl, "BATCH_SIZE", 3)
+    monkeypatch.setattr(
+        etl, "get_worker_db", lambda: _FakeDB(_FailingCursor(good_marks=5))
+    )
+    monkeypatch.setattr(
+        etl, "create_ttl_header", lambda *args: ((b"head\n", b"tail\n"), 100, 100)
+    )
+    monkeypatch.setattr(etl, "add_mark_to_ttl", lambda mark, w, h: (" ;\n m", True))
+    monkeypatch.setitem(etl._worker_context, "checkpoint", _FakeCheckpoint())
+
+    analysis_doc = {
+        "_id": "a1",
+        "analysis": {"execution_id": "exec"},
+        "image": {"imageid": "img"},
+    }
+    result = etl.process_analysis_worker((0, analysis_doc))
+
+    assert result[0] == "failed"
+    out_dir = tmp_path / "ttl_output" / "exec" / "img"
+    # The first, full batch was finished; the second died with the cursor
+    assert sorted(p.name for p in out_dir.iterdir()) == ["batch_000001.ttl.gz"]
+
+
+def test_idle_flush_writes_completed_ids_after_timer(etl, tmp_path, monkeypatch):
+    monkeypatch.setattr(etl, "CHECKPOINT_FLUSH_EVERY", 1000)
+    (tmp_path / "checkpoints").mkdir()
+    checkpoint = etl.ParallelCheckpointManager(tmp_path / "checkpoints")
+    checkpoint.queue_completed("a1")
+    checkpoint.flush_if_due()
+    assert not checkpoint.completed_file.exists()  # Still buffered
+
+    checkpoint.last_flush -= etl.CHECKPOINT_FLUSH_SECONDS
+    checkpoint.flush_if_due()
+    assert checkpoint.completed_file.read_text() == "a1\n"
+
+
+def _ring(vertex_count):
+    """Open ring of distinct normalized vertices"""
+    return [[i / 100, 0.5] for i in range(vertex_count)]
+
+
+def _polygon(ring):
+    return {"type": "Polygon", "coordinates": [ring]}
+
+
+@pytest.mark.parametrize("vertex_count", [4, 20])
+def test_polygon_to_wkt_scales_and_closes_ring(etl, vertex_count):
+    wkt = etl.polygon_to_wkt(_polygon(_ring(vertex_count)), 100, 100)
+    vertices = wkt[len("POLYGON ((") : -len("))")].split(", ")
+    assert vertices[:2] == ["0.00 50.00", "1.00 50.00"]
+    assert len(vertices) == vertex_count + 1 and vertices[0] == vertices[-1]
+
+
+@pytest.mark.parametrize("vertex_count", [4, 20])
+@pytest.mark.parametrize(
+    "bad_vertex",
+    [[None, 0.5], [float("nan"), 0.5], [0.5, float("inf")], ["0.1", "0.2"]],
+)
+def test_polygon_to_wkt_rejects_non_numeric_vertex(etl, vertex_count, bad_vertex):
+    ring = _ring(vertex_count)
+    ring[vertex_count // 2] = bad_vertex
+    assert etl.polygon_to_wkt(_polygon(ring), 100, 100) is None
+
+
+@pytest.mark.parametrize("vertex_count", [4, 20])
+def test_polygon_to_wkt_rejects_string_ring(etl, vertex_count):
+    ring = [[str(x), str(y)] for x, y in _ring(vertex_count)]
+    assert etl.polygon_to_wkt(_polygon(ring), 100, 100) is None
@@ -0,0 +1,68 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from bson import ObjectId
+
+from utils import serialization
+from utils.serialization import MongoJSONEncoder
+
+DOCS = [
+    {"name": "Ünïcødé ✓ 肿瘤", "nested": {"label": "naïve"}, "n": None},
+    {"x": float("nan"), "y": [1.5, float("inf")], "z": -float("inf")},
+    {"d": Decimal("NaN"), "e": Decimal("2.5"), "name": "é"},
+    {"tiny": 1.26e-05, "huge": 1e16, "plain": 0.0001, "del": "a\x7fb"},
+    {
+        "_id": ObjectId("507f1f77bcf86cd799439011"),
+        "created": datetime(2024, 1, 2, 3, 4, 5),
+        "coords": [[0.25, 0.5], [0.75, 1.0]],
+        "big": 2**70,
+        "empty": {},
+        "none": [],
+    },
+]
+
+
+def _baseline(doc, indent):
+    """What serialize_mongo_document wrote before orjson support"""
+    return json.dumps(doc, cls=MongoJSONEncoder, indent=indent)
+
+
+@pytest.mark.parametrize("doc", DOCS)
+@pytest.mark.parametrize("indent", [None, 2, 4])
+def test_serialize_matches_baseline_json(doc, indent):
+    assert serialization.serialize_mongo_document(doc, indent=indent) == _baseline(
+        doc, indent
+    )
+
+
+@pytest.mark.parametrize("doc", DOCS)
+@pytest.mark.parametrize("indent", [None, 2])
+def test_json_fallback_is_baseline_json(doc, indent, monkeypatch):
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert serialization.serialize_mongo_document(doc, indent=indent) == _baseline(
+        doc, indent
+    )
+
+
+def test_non_ascii_and_nan_stay_escaped(tmp_path):
+    path = tmp_path / "doc.json"
+    serialization.save_mongo_documents_to_file(DOCS[:2], str(path))
+    assert path.read_text() == _baseline(DOCS[:2], 2)
+    assert "\\u00dcn\\u00efc\\u00f8d\\u00e9" in path.read_text()
+    assert '"x": NaN' in path.read_text()
+
+
+@pytest.mark.parametrize("doc", DOCS)
+def test_stream_lines_match_compact_json(doc, tmp_path):
+    path = tmp_path / "docs.ndjson"
+    serialization.save_mongo_documents_to_file_stream([doc, doc], str(path))
+    line = json.dumps(doc, cls=MongoJSONEncoder, separators=(",", ":"))
+    assert path.read_text() == f"{line}\n{line}\n"
+
+
+def test_orjson_used_for_plain_documents():
+    pytest.importorskip("orjson")
+    doc = {"_id": ObjectId(), "coords": [[0.25, 0.5]], "label": "tumor"}
+    assert serialization._orjson_dumps(doc, 2) is not None
@@ -25,13 +25,15 @@ from .logger import (get_logger, setup_basic_logger, setup_etl_logger,
                      setup_logger)
 from .mongo_client import ManagedMongoClient, MongoConnection, mongo_connection
 from .rdf_utils import (EX, GEO, PROV, add_label, add_provenance, add_type,
-                        add_wkt_geometry, create_analysis_uri,
-                        create_execution_uri, create_graph, create_image_uri,
-                        create_mark_uri, create_uri, load_graph,
-                        serialize_graph)
+                        add_wkt_geometries, add_wkt_geometry,
+                        create_analysis_uri, create_execution_uri,
+                        create_graph, create_image_uri, create_mark_uri,
+                        create_uri, load_graph, serialize_graph)
 from .serialization import (MongoJSONEncoder, clean_mongo_document,
-                            objectid_to_str, save_mongo_document_to_file,
+                            clean_mongo_document_inplace, objectid_to_str,
+                            save_mongo_document_to_file,
                             save_mongo_documents_to_file,
+                            save_mongo_documents_to_file_stream,
                             serialize_mongo_document,
                             serialize_mongo_documents, str_to_objectid)
 
@@ -58,10 +60,12 @@ __all__ = [
     # serialization
     "MongoJSONEncoder",
     "clean_mongo_document",
+    "clean_mongo_document_inplace",
     "serialize_mongo_document",
     "serialize_mongo_documents",
     "save_mongo_document_to_file",
     "save_mongo_documents_to_file",
+    "save_mongo_documents_to_file_stream",
     "objectid_to_str",
     "str_to_objectid",
     # geometry
@@ -90,6 +94,7 @@ __all__ = [
     "create_image_uri",
     "create_execution_uri",
     "add_wkt_geometry",
+    "add_wkt_geometries",
     "add_provenance",
     "add_label",
     "add_type",
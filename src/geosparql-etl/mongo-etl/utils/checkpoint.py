@@ -1,6 +1,10 @@
 """Checkpoint and state management utilities for resumable ETL operations."""
 
+import atexit
 import json
+import os
+import signal
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set
@@ -155,28 +159,69 @@ class CheckpointManager:
         }
 
 
+def _exit_on_sigterm(signum: int, frame: Any) -> None:
+    """Turn SIGTERM into SystemExit so atexit handlers and finally blocks run."""
+    raise SystemExit(128 + signum)
+
+
+def _install_sigterm_exit() -> None:
+    """Route SIGTERM through _exit_on_sigterm unless the program handles it.
+
+    Python already raises KeyboardInterrupt on SIGINT, but by default SIGTERM
+    kills the process without running atexit handlers.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return  # signal.signal only works in the main thread
+    if signal.getsignal(signal.SIGTERM) is signal.SIG_DFL:
+        signal.signal(signal.SIGTERM, _exit_on_sigterm)
+
+
 class SimpleCheckpoint:
     """Simplified checkpoint manager for basic use cases.
 
     Example usage:
-        checkpoint = SimpleCheckpoint("checkpoint.json")
-
-        for item in items:
-            if item['id'] in checkpoint:
-                continue
-            process(item)
-            checkpoint.add(item['id'])
-            checkpoint.save()
+        with SimpleCheckpoint("checkpoint.json") as checkpoint:
+            for item in items:
+                if item['id'] in checkpoint:
+                    continue
+                process(item)
+                checkpoint.add(item['id'])
+                checkpoint.save()
+
+    save() only writes the file every ``flush_every`` calls. Unsaved progress
+    is flushed by close() (or leaving the ``with`` block), at interpreter
+    exit, and on SIGINT/SIGTERM (a default SIGTERM handler is replaced by one
+    raising SystemExit). Only a hard crash or SIGKILL can lose progress, and
+    then up to ``flush_every`` items may be processed again. Call flush() to
+    persist immediately.
     """
 
-    def __init__(self, checkpoint_file: str):
+    FLUSH_EVERY = 100
+
+    def __init__(self, checkpoint_file: str, flush_every: int = FLUSH_EVERY):
         """Initialize simple checkpoint manager.
 
         Args:
             checkpoint_file: Path to checkpoint file
+            flush_every: Number of save() calls between writes (default: 100)
         """
         self.checkpoint_file = Path(checkpoint_file)
         self.processed: Set[str] = self._load()
+        self.flush_every = max(1, flush_every)
+        self._unsaved = 0
+        atexit.register(self.flush)
+        _install_sigterm_exit()
+
+    def __enter__(self) -> "SimpleCheckpoint":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Flush unsaved progress and drop the interpreter-exit hook."""
+        self.flush()
+        atexit.unregister(self.flush)
 
     def _load(self) -> Set[str]:
         """Load processed items from file.
@@ -197,9 +242,20 @@ class SimpleCheckpoint:
         return set()
 
     def save(self) -> None:
-        """Save checkpoint to file."""
-        with open(self.checkpoint_file, "w") as f:
+        """Save checkpoint, writing the file every ``flush_every`` calls."""
+        self._unsaved += 1
+        if self._unsaved >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write any unsaved progress to the checkpoint file atomically."""
+        if not self._unsaved:
+            return
+        tmp_file = self.checkpoint_file.with_name(self.checkpoint_file.name + ".tmp")
+        with open(tmp_file, "w") as f:
             json.dump(list(self.processed), f, indent=2)
+        os.replace(tmp_file, self.checkpoint_file)
+        self._unsaved = 0
 
     def add(self, item_id: str) -> None:
         """Add item to checkpoint.
@@ -231,4 +287,5 @@ class SimpleCheckpoint:
     def clear(self) -> None:
         """Clear all processed items."""
         self.processed.clear()
-        self.save()
+        self._unsaved += 1
+        self.flush()
@@ -1,8 +1,8 @@
 """RDF and graph utilities for MongoDB to RDF conversion."""
 
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
 
-from bson import ObjectId
 from rdflib import Graph, Literal, Namespace, URIRef
 from rdflib.namespace import RDF, RDFS, XSD
 
@@ -11,6 +11,16 @@ GEO = Namespace("http://www.opengis.net/ont/geosparql#")
 PROV = Namespace("http://www.w3.org/ns/prov#")
 EX = Namespace("http://example.org/")
 
+# Terms used on every call of the add_* helpers. Namespace attribute access
+# builds a new URIRef each time, so resolve them once here
+_WKT_DATATYPE = GEO.wktLiteral
+_RDF_TYPE = RDF.type
+_RDFS_LABEL = RDFS.label
+
+# Plain literals for small repeated values (labels); Literal is immutable.
+# typed=True: 1, 1.0 and True are equal keys but different literals
+_plain_literal = lru_cache(maxsize=4096, typed=True)(Literal)
+
 
 def create_graph(namespaces: Optional[Dict[str, Namespace]] = None) -> Graph:
     """Create an RDF graph with common namespace bindings.
@@ -62,9 +72,16 @@ def create_uri(namespace: Namespace, entity_type: str, entity_id: Any) -> URIRef
         mark_uri = create_uri(EX, "mark", mark_doc["_id"])
         # Returns: http://example.org/mark/507f1f77bcf86cd799439011
     """
-    if isinstance(entity_id, ObjectId):
-        entity_id = str(entity_id)
-    return namespace[f"{entity_type}/{entity_id}"]
+    return _create_uri_cached(str(namespace), entity_type, str(entity_id))
+
+
+@lru_cache(maxsize=65536)
+def _create_uri_cached(ns_str: str, entity_type: str, sid: str) -> URIRef:
+    """Build (and memoize) the URIRef for create_uri.
+
+    Many marks share one image/analysis/agent, so the same URIs repeat.
+    """
+    return URIRef(f"{ns_str}{entity_type}/{sid}")
 
 
 def create_mark_uri(mark_id: Any, namespace: Namespace = EX) -> URIRef:
@@ -149,10 +166,36 @@ def add_wkt_geometry(
         mark_uri = create_mark_uri(mark["_id"])
         add_wkt_geometry(g, mark_uri, "POINT(10 20)")
     """
-    wkt_literal = Literal(wkt_string, datatype=GEO.wktLiteral)
+    wkt_literal = Literal(wkt_string, datatype=_WKT_DATATYPE)
     graph.add((subject, predicate, wkt_literal))
 
 
+def add_wkt_geometries(
+    graph: Graph,
+    items: Iterable[Tuple[URIRef, str]],
+    predicate: URIRef = GEO.asWKT,
+) -> None:
+    """Add many WKT geometries to graph in one bulk insert.
+
+    Args:
+        graph: RDF graph
+        items: Iterable of (subject URI, WKT geometry string) pairs
+        predicate: Predicate to use (default: geo:asWKT)
+
+    Example:
+        from utils.rdf_utils import add_wkt_geometries
+
+        g = create_graph()
+        add_wkt_geometries(
+            g, ((create_mark_uri(m["_id"]), m["wkt"]) for m in marks)
+        )
+    """
+    graph.addN(
+        (subject, predicate, Literal(wkt_string, datatype=_WKT_DATATYPE), graph)
+        for subject, wkt_string in items
+    )
+
+
 def add_provenance(
     graph: Graph,
     entity_uri: URIRef,
@@ -192,7 +235,7 @@ def add_label(graph: Graph, subject: URIRef, label: str) -> None:
     Example:
         add_label(g, mark_uri, "Tumor boundary annotation")
     """
-    graph.add((subject, RDFS.label, Literal(label)))
+    graph.add((subject, _RDFS_LABEL, _plain_literal(label)))
 
 
 def add_type(graph: Graph, subject: URIRef, rdf_type: URIRef) -> None:
@@ -206,7 +249,7 @@ def add_type(graph: Graph, subject: URIRef, rdf_type: URIRef) -> None:
     Example:
         add_type(g, mark_uri, EX.Annotation)
     """
-    graph.add((subject, RDF.type, rdf_type))
+    graph.add((subject, _RDF_TYPE, rdf_type))
 
 
 def add_literal_property(
@@ -314,8 +357,7 @@ def merge_graphs(*graphs: Graph) -> Graph:
     """
     merged = create_graph()
     for g in graphs:
-        for triple in g:
-            merged.add(triple)
+        merged += g  # one addN per graph instead of add() per triple
     return merged
 
 
@@ -1,12 +1,23 @@
 """JSON serialization utilities for MongoDB documents."""
 
 import json
+import math
+import re
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Optional
 
 from bson import ObjectId
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # Datetimes go through _default so output matches MongoJSONEncoder
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
 
 class MongoJSONEncoder(json.JSONEncoder):
     """Custom JSON encoder for MongoDB documents.
@@ -29,23 +40,112 @@ class MongoJSONEncoder(json.JSONEncoder):
         Returns:
             JSON-serializable representation of the object
         """
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        if isinstance(obj, date):
-            return obj.isoformat()
-        if isinstance(obj, Decimal):
-            return float(obj)
+        if isinstance(obj, (ObjectId, date, Decimal)):
+            return _default(obj)
         return super().default(obj)
 
 
+def _default(obj: Any) -> Any:
+    """orjson default hook for the types handled by MongoJSONEncoder."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, date):  # also datetime
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _orjson_dumps(obj: Any, indent: Optional[int]) -> Optional[bytes]:
+    """Encode with orjson when its output is byte-for-byte what json gives.
+
+    The json equivalent is json.dumps(obj, cls=MongoJSONEncoder, indent=2) for
+    indent=2, and the same with separators=(",", ":") for indent=None (orjson
+    cannot write json's default ", " / ": " compact spacing).
+
+    Returns None when the caller should use json instead: orjson is missing,
+    the indent is anything else, the value is something orjson cannot encode
+    (e.g. an int over 64 bits), or the output would differ from json's -
+    non-ASCII text and DEL (json escapes them as \\uXXXX), NaN/Infinity
+    (orjson writes null) or floats json writes in exponent form (orjson
+    formats them differently).
+    """
+    if orjson is None or indent not in (None, 2):
+        return None
+    option = _ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else _ORJSON_OPTIONS
+    try:
+        data = orjson.dumps(obj, default=_default, option=option)
+    except orjson.JSONEncodeError:
+        return None
+    if (
+        not data.isascii()
+        or b"\x7f" in data
+        or _ORJSON_EXPONENT_FLOAT.search(data)
+    ):
+        return None
+    # Non-finite numbers can only hide behind a null, so skip the scan otherwise
+    if b"null" in data and _has_non_finite(obj):
+        return None
+    return data
+
+
+# Number tokens that json writes in exponent form (below 1e-4 or from 1e16):
+# orjson writes 1e-05 as 0.00001 and 1e+16 as 1e16. A match inside a string
+# value only costs a fallback to json
+_ORJSON_EXPONENT_FLOAT = re.compile(rb"(?<=[:\[,\s])-?(?:\d[\d.]*e|0\.0000)")
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """Whether obj holds a NaN or infinite float or Decimal at any depth."""
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, Decimal) and not value.is_finite():
+            return True
+    return False
+
+
+def _isoformat(value: date) -> str:
+    """ISO 8601 string for a date or datetime."""
+    return value.isoformat()
+
+
+# Exact-type converters for the MongoDB values JSON cannot represent
+_CONVERTERS = {
+    ObjectId: str,
+    datetime: _isoformat,
+    date: _isoformat,
+    Decimal: float,
+}
+
+
+def _convert_value(value: Any) -> Any:
+    """Convert a subclass of a MongoDB-specific type (exact types hit _CONVERTERS)."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
 def clean_mongo_document(
     doc: Dict[str, Any], convert_id: bool = True
 ) -> Dict[str, Any]:
     """Clean MongoDB document for JSON serialization.
 
-    Recursively converts ObjectId and datetime objects to strings.
+    Converts ObjectId and datetime objects to strings at any depth, walking
+    nested dicts (and dicts inside lists) with an explicit stack instead of
+    recursion. Lists holding no dicts (e.g. geometry coordinates) are shared
+    with the source document rather than copied.
 
     Args:
         doc: MongoDB document dictionary
@@ -64,33 +164,70 @@ def clean_mongo_document(
     if not isinstance(doc, dict):
         return doc
 
-    cleaned = {}
-    for key, value in doc.items():
-        if key == "_id" and convert_id and isinstance(value, ObjectId):
-            cleaned[key] = str(value)
-        elif isinstance(value, ObjectId):
-            cleaned[key] = str(value)
-        elif isinstance(value, (datetime, date)):
-            cleaned[key] = value.isoformat()
-        elif isinstance(value, Decimal):
-            cleaned[key] = float(value)
-        elif isinstance(value, dict):
-            cleaned[key] = clean_mongo_document(value, convert_id)
-        elif isinstance(value, list):
-            cleaned[key] = [
-                (
-                    clean_mongo_document(item, convert_id)
-                    if isinstance(item, dict)
-                    else item
-                )
-                for item in value
-            ]
-        else:
-            cleaned[key] = value
+    cleaned: Dict[str, Any] = {}
+    stack = [(doc, cleaned)]
+    while stack:
+        source, target = stack.pop()
+        for key, value in source.items():
+            converter = _CONVERTERS.get(type(value))
+            if converter is not None:
+                target[key] = converter(value)
+            elif isinstance(value, dict):
+                child: Dict[str, Any] = {}
+                target[key] = child
+                stack.append((value, child))
+            elif isinstance(value, list):
+                if not any(isinstance(item, dict) for item in value):
+                    target[key] = value  # Leaf list: nothing to clean
+                    continue
+                items = []
+                for item in value:
+                    if isinstance(item, dict):
+                        child = {}
+                        items.append(child)
+                        stack.append((item, child))
+                    else:
+                        items.append(item)
+                target[key] = items
+            else:
+                target[key] = _convert_value(value)
 
     return cleaned
 
 
+def clean_mongo_document_inplace(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Clean a MongoDB document for JSON serialization without copying it.
+
+    Same conversions as clean_mongo_document, but values are replaced inside
+    the existing dicts and lists. Use when the raw document is not needed
+    afterwards (e.g. straight off a cursor).
+
+    Args:
+        doc: MongoDB document dictionary (modified in place)
+
+    Returns:
+        The same document, for chaining
+    """
+    if not isinstance(doc, dict):
+        return doc
+
+    stack = [doc]
+    while stack:
+        node = stack.pop()
+        for key, value in node.items():
+            converter = _CONVERTERS.get(type(value))
+            if converter is not None:
+                node[key] = converter(value)
+            elif isinstance(value, dict):
+                stack.append(value)
+            elif isinstance(value, list):
+                stack.extend(item for item in value if isinstance(item, dict))
+            else:
+                node[key] = _convert_value(value)
+
+    return doc
+
+
 def serialize_mongo_document(doc: Dict[str, Any], indent: int = 2) -> str:
     """Serialize MongoDB document to JSON string.
 
@@ -105,6 +242,9 @@ def serialize_mongo_document(doc: Dict[str, Any], indent: int = 2) -> str:
         doc = db.collection.find_one()
         json_str = serialize_mongo_document(doc)
     """
+    data = _orjson_dumps(doc, indent) if indent is not None else None
+    if data is not None:
+        return data.decode()
     return json.dumps(doc, cls=MongoJSONEncoder, indent=indent)
 
 
@@ -122,6 +262,9 @@ def serialize_mongo_documents(docs: list, indent: int = 2) -> str:
         docs = list(db.collection.find())
         json_str = serialize_mongo_documents(docs)
     """
+    data = _orjson_dumps(docs, indent) if indent is not None else None
+    if data is not None:
+        return data.decode()
     return json.dumps(docs, cls=MongoJSONEncoder, indent=indent)
 
 
@@ -139,6 +282,12 @@ def save_mongo_document_to_file(
         doc = db.collection.find_one()
         save_mongo_document_to_file(doc, "output.json")
     """
+    data = _orjson_dumps(doc, indent) if indent is not None else None
+    if data is not None:
+        with open(file_path, "wb") as f:
+            f.write(data)
+        return
+
     with open(file_path, "w") as f:
         json.dump(doc, f, cls=MongoJSONEncoder, indent=indent)
 
@@ -155,10 +304,64 @@ def save_mongo_documents_to_file(docs: list, file_path: str, indent: int = 2) ->
         docs = list(db.collection.find())
         save_mongo_documents_to_file(docs, "output.json")
     """
+    data = _orjson_dumps(docs, indent) if indent is not None else None
+    if data is not None:
+        with open(file_path, "wb") as f:
+            f.write(data)
+        return
+
     with open(file_path, "w") as f:
         json.dump(docs, f, cls=MongoJSONEncoder, indent=indent)
 
 
+def save_mongo_documents_to_file_stream(
+    docs: Iterable[Dict[str, Any]], file_path: str, ndjson: bool = True
+) -> int:
+    """Save MongoDB documents to a JSON file one document at a time.
+
+    Unlike save_mongo_documents_to_file, the documents are never held in a
+    list or encoded as one string, so a cursor can be passed straight in.
+
+    Args:
+        docs: Iterable of MongoDB documents (list, generator or cursor)
+        file_path: Path to output file
+        ndjson: Write one document per line (default: True); False writes
+            a single JSON array
+
+    Returns:
+        Number of documents written
+
+    Example:
+        cursor = db.collection.find()
+        save_mongo_documents_to_file_stream(cursor, "output.ndjson")
+    """
+    count = 0
+    with open(file_path, "wb") as f:
+        if ndjson:
+            for doc in docs:
+                f.write(_dumps_compact(doc))
+                f.write(b"\n")
+                count += 1
+            return count
+
+        f.write(b"[")
+        for doc in docs:
+            if count:
+                f.write(b",\n")
+            f.write(_dumps_compact(doc))
+            count += 1
+        f.write(b"]\n")
+    return count
+
+
+def _dumps_compact(doc: Dict[str, Any]) -> bytes:
+    """Encode one document as compact JSON bytes."""
+    data = _orjson_dumps(doc, None)
+    if data is not None:
+        return data
+    return json.dumps(doc, cls=MongoJSONEncoder, separators=(",", ":")).encode()
+
+
 def objectid_to_str(obj_id: ObjectId) -> str:
     """Convert ObjectId to string.
 
@@ -27,6 +27,7 @@ import csv
 import gzip
 import hashlib
 import subprocess
+import time
 from datetime import datetime, timezone
 from functools import partial
 from multiprocessing import Pool, cpu_count
@@ -43,6 +44,59 @@ except ImportError:
 # Using SNOMED code for nuclear material/nucleoplasm
 NUCLEAR_MATERIAL_SNOMED = "http://snomed.info/id/68841002"  # Nucleoplasm
 
+# Feature (rdfs:member) templates, one per combination of the optional
+# (AreaInPixels, PhysicalSize) columns. Kept as pre-encoded UTF-8 bytes so the
+# static ~300 bytes per feature are never re-encoded; only the WKT and area
+# values are encoded and dropped into the %b slots.
+# Use probability of 1.0 as placeholder (as per requirements)
+_FEATURE_HEAD = (
+    """        rdfs:member          [ a                   geo:Feature;
+                               geo:hasGeometry     [ geo:asWKT  "%b"^^geo:wktLiteral ];
+                               hal:classification  sno:"""
+    + NUCLEAR_MATERIAL_SNOMED.split("/")[-1]
+    + """;
+                               hal:measurement     [ hal:hasProbability  "1.0"^^xsd:float ]"""
+).encode("utf-8")
+_FEATURE_AREA = b""";
+                               hal:areaInPixels    "%b"^^xsd:int"""
+_FEATURE_PHYS = b""";
+                               hal:physicalSize    "%b"^^xsd:float"""
+_FEATURE_TAIL = b"""
+                             ]"""
+FEATURE_TEMPLATES = {
+    (has_area, has_phys): _FEATURE_HEAD
+    + (_FEATURE_AREA if has_area else b"")
+    + (_FEATURE_PHYS if has_phys else b"")
+    + _FEATURE_TAIL
+    for has_area in (False, True)
+    for has_phys in (False, True)
+}
+_FEATURE_SEPARATOR = b";\n"
+_COLLECTION_TERMINATOR = b" .\n"
+
+
+# dc:date only needs "when this ETL ran" granularity, so each worker reuses
+# one timestamp and refreshes it at most every TIMESTAMP_REFRESH_SECONDS
+TIMESTAMP_REFRESH_SECONDS = 60
+_run_timestamp = None
+_run_timestamp_taken = 0.0
+
+
+def get_run_timestamp():
+    """
+    Get the cached UTC ISO-8601 timestamp for dc:date.
+
+    Returns:
+        Timestamp string, at most TIMESTAMP_REFRESH_SECONDS old
+    """
+    global _run_timestamp, _run_timestamp_taken
+    now = time.monotonic()
+    stale = now - _run_timestamp_taken >= TIMESTAMP_REFRESH_SECONDS
+    if _run_timestamp is None or stale:
+        _run_timestamp = datetime.now(tz=timezone.utc).isoformat()
+        _run_timestamp_taken = now
+    return _run_timestamp
+
 
 def parse_polygon_to_wkt(polygon_string):
     """
@@ -60,19 +114,18 @@ def parse_polygon_to_wkt(polygon_string):
     # Remove brackets and split by colons
     coords = polygon_string.strip("[]").split(":")
 
-    # Parse coordinate pairs
-    wkt_coords = []
-    for i in range(0, len(coords), 2):
-        if i + 1 < len(coords):
-            x = coords[i]
-            y = coords[i + 1]
-            wkt_coords.append(f"{x} {y}")
+    # Keep complete coordinate pairs only (drop a dangling odd value)
+    n_points = len(coords) // 2
+    del coords[2 * n_points :]
 
     # Close the polygon by adding first point at the end if not already closed
-    if len(wkt_coords) > 0 and wkt_coords[0] != wkt_coords[-1]:
-        wkt_coords.append(wkt_coords[0])
+    if n_points and coords[:2] != coords[-2:]:
+        coords.extend(coords[:2])
+        n_points += 1
 
-    wkt = f"POLYGON (({', '.join(wkt_coords)}))"
+    # Format all pairs with a single C-level % call
+    template = ", ".join(["%s %s"] * n_points)
+    wkt = f"POLYGON (({template % tuple(coords)}))"
     return wkt
 
 
@@ -165,6 +218,27 @@ def create_geosparql_ttl(csv_path, image_name, image_hash=None, cancer_type=None
     Returns:
         Turtle/RDF content as string
     """
+    return create_geosparql_ttl_bytes(
+        csv_path, image_name, image_hash, cancer_type
+    ).decode("utf-8")
+
+
+def create_geosparql_ttl_bytes(
+    csv_path, image_name, image_hash=None, cancer_type=None
+):
+    """
+    Convert nuclear segmentation CSV to UTF-8 encoded GeoSPARQL TTL.
+    Same output as create_geosparql_ttl, ready to write to a binary file.
+
+    Args:
+        csv_path: Path to CSV file (contains patch data)
+        image_name: Name of the parent SVS image (from directory name)
+        image_hash: SHA-256 hash of image (optional, generated from image_name if not provided)
+        cancer_type: Cancer type identifier (e.g., "blca") extracted from polygon directory
+
+    Returns:
+        Turtle/RDF content as UTF-8 bytes
+    """
     csv_path = Path(csv_path)
     filename = csv_path.name
 
@@ -175,7 +249,7 @@ def create_geosparql_ttl(csv_path, image_name, image_hash=None, cancer_type=None
     if image_hash is None:
         image_hash = get_image_hash(image_id=image_name)
 
-    timestamp = datetime.now(tz=timezone.utc).isoformat()
+    timestamp = get_run_timestamp()
 
     # TTL header with prefixes
     ttl_content = """@prefix dc:   <http://purl.org/dc/terms/> .
@@ -226,8 +300,8 @@ def create_geosparql_ttl(csv_path, image_name, image_hash=None, cancer_type=None
 """
 
     # Read CSV and process features
+    parts = [ttl_content.encode("utf-8")]
     feature_count = 0
-    snomed_id = NUCLEAR_MATERIAL_SNOMED.split("/")[-1]
 
     with open(csv_path, "r") as csvfile:
         reader = csv.DictReader(csvfile)
@@ -248,33 +322,23 @@ def create_geosparql_ttl(csv_path, image_name, image_hash=None, cancer_type=None
 
             # Add separator for multiple features
             if feature_count > 0:
-                ttl_content += ";\n"
-
-            # Add feature with proper indentation for <> subject
-            # Use probability of 1.0 as placeholder (as per requirements)
-            ttl_content += f"""        rdfs:member          [ a                   geo:Feature;
-                               geo:hasGeometry     [ geo:asWKT  "{wkt}"^^geo:wktLiteral ];
-                               hal:classification  sno:{snomed_id};
-                               hal:measurement     [ hal:hasProbability  "1.0"^^xsd:float ]"""
+                parts.append(_FEATURE_SEPARATOR)
 
-            # Optionally include area information as additional properties
+            # Add the whole feature with one pre-built template, picked by
+            # which optional area properties this row carries
+            values = [wkt.encode("utf-8")]
             if area_pixels:
-                ttl_content += f""";
-                               hal:areaInPixels    "{area_pixels}"^^xsd:int"""
-
+                values.append(area_pixels.encode("utf-8"))
             if physical_size:
-                ttl_content += f""";
-                               hal:physicalSize    "{physical_size}"^^xsd:float"""
-
-            # Close the feature
-            ttl_content += """
-                             ]"""
+                values.append(physical_size.encode("utf-8"))
+            template = FEATURE_TEMPLATES[(bool(area_pixels), bool(physical_size))]
+            parts.append(template % tuple(values))
             feature_count += 1
 
     # Close the feature collection with proper terminator
-    ttl_content += " .\n"
+    parts.append(_COLLECTION_TERMINATOR)
 
-    return ttl_content
+    return b"".join(parts)
 
 
 def process_single_csv(
@@ -306,8 +370,8 @@ def process_single_csv(
         if output_file.exists():
             return ("skipped", csv_file.name)
 
-        # Convert to GeoSPARQL with cancer type
-        ttl_content = create_geosparql_ttl(
+        # Convert to GeoSPARQL with cancer type (already UTF-8 encoded)
+        ttl_bytes = create_geosparql_ttl_bytes(
             csv_file, image_name, image_hash, cancer_type
         )
 
@@ -315,11 +379,10 @@ def process_single_csv(
         image_output_dir.mkdir(parents=True, exist_ok=True)
 
         if compress:
-            with gzip.open(output_file, "wt", encoding="utf-8") as f:
-                f.write(ttl_content)
+            with gzip.open(output_file, "wb") as f:
+                f.write(ttl_bytes)
         else:
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(ttl_content)
+            output_file.write_bytes(ttl_bytes)
 
         return ("success", csv_file.name)
 